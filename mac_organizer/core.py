@@ -7,19 +7,56 @@ from __future__ import annotations
 
 import argparse
 import dataclasses
+import errno
+import filecmp
+import functools
 import hashlib
 import json
 import mimetypes
+import mmap
 import os
+import re
 import shutil
 import sys
 from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Iterable, Iterator, List, Mapping, MutableMapping, Optional, Tuple
-
-TEXT_MIME_PREFIXES = {"text/", "application/json", "application/xml"}
+from typing import (
+    AbstractSet,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Set,
+    TextIO,
+    Tuple,
+    Union,
+)
+
+try:
+    import xxhash
+except ImportError:  # pragma: no cover - optional dependency
+    xxhash = None
+
+try:
+    import blake3
+except ImportError:  # pragma: no cover - optional dependency
+    blake3 = None
+
+TEXT_MIME_PREFIXES = frozenset({"text/", "application/json", "application/xml"})
+_TEXT_PREFIXES = tuple(prefix.rstrip("/") for prefix in TEXT_MIME_PREFIXES)
+# Extensions worth scanning for theme keywords; other EXTENSION_MAP entries are
+# classified by extension alone.
+_TEXT_EXTENSIONS = frozenset({".txt", ".md", ".csv", ".json", ".xml", ".log", ".html", ".rtf"})
 DEFAULT_ROOT_NAME = "Organized"
+# Runs of letters and digits, matching what str.isalnum() accepts.
+_TOKEN_RE = re.compile(r"[^\W_]+")
 
 KEYWORD_THEMES: Mapping[str, Tuple[str, ...]] = {
     "Finance": (
@@ -66,6 +103,10 @@ KEYWORD_THEMES: Mapping[str, Tuple[str, ...]] = {
     ),
 }
 
+_KEYWORD_TO_THEME: Dict[str, str] = {
+    keyword: theme for theme, keywords in KEYWORD_THEMES.items() for keyword in keywords
+}
+
 EXTENSION_MAP: Mapping[str, str] = {
     # Documents
     ".pdf": "Documents",
@@ -111,20 +152,73 @@ EXTENSION_MAP: Mapping[str, str] = {
 }
 
 DEFAULT_CATEGORY = "Others"
-
-
-PROTECTED_DIR_NAMES = {
-    "Applications",
-    "Library",
-    "System",
-    "bin",
-    "sbin",
-    "usr",
-    "etc",
-    "var",
-    "opt",
-    "Volumes",
-}
+# DirEntry.inode() is free on POSIX but costs a stat() call per entry on Windows.
+_SORT_BY_INODE = not sys.platform.startswith("win")
+# Categories whose files are further sorted into YEAR/MONTH folders.
+_DATED_CATEGORIES = frozenset({"Images", "Videos", "Audio"})
+# Bytes read from each end of a file before committing to a full hash.
+SAMPLE_BYTES = 64 * 1024
+# Files that read content cost about 0.7 ms each to classify, while starting a
+# spawn-based pool (the macOS default) takes close to a second.
+PROCESS_POOL_MIN_TEXT_FILES = 2000
+SAMPLE_READ_BATCH_MIN_FILES = 1000
+SAMPLE_READ_WORKERS = 64
+# Larger files (and every file on 32-bit builds) are hashed in chunks instead.
+MMAP_MAX_BYTES = 1024**3 if sys.maxsize > 2**32 else 0
+
+
+@functools.lru_cache(maxsize=None)
+def _mime_for_suffix(suffix: str) -> Optional[str]:
+    return mimetypes.guess_type(f"file{suffix}")[0]
+
+
+def _category_for_mime(mime: Optional[str]) -> Optional[str]:
+    if not mime:
+        return None
+    if mime.startswith("image/"):
+        return "Images"
+    if mime.startswith("video/"):
+        return "Videos"
+    if mime.startswith("audio/"):
+        return "Audio"
+    if mime in {"application/zip", "application/x-tar"}:
+        return "Archives"
+    if mime.startswith("text/"):
+        return "Documents"
+    return None
+
+
+def _build_suffix_table() -> Dict[str, str]:
+    if not mimetypes.inited:
+        mimetypes.init()
+    table = {}
+    for suffix in list(mimetypes.types_map):
+        category = _category_for_mime(_mime_for_suffix(suffix))
+        if category and suffix == suffix.lower():
+            table[suffix] = category
+    table.update(EXTENSION_MAP)
+    return table
+
+
+# EXTENSION_MAP merged with the MIME rules for every suffix mimetypes knows, so
+# the common case in guess_category is a single dict lookup.
+SUFFIX_TO_CATEGORY: Mapping[str, str] = _build_suffix_table()
+
+
+PROTECTED_DIR_NAMES = frozenset(
+    {
+        "Applications",
+        "Library",
+        "System",
+        "bin",
+        "sbin",
+        "usr",
+        "etc",
+        "var",
+        "opt",
+        "Volumes",
+    }
+)
 
 
 def walk_files(
@@ -133,98 +227,172 @@ def walk_files(
     protected_dir_names: Iterable[str] = (),
     skip_hidden: bool = False,
     exclude: Optional[Path] = None,
-) -> Iterator[Path]:
-    protected = {name for name in protected_dir_names}
-    for dirpath, dirnames, filenames in os.walk(root):
-        current_dir = Path(dirpath)
-        if exclude and (current_dir == exclude or exclude in current_dir.parents):
-            dirnames[:] = []
+) -> Iterator[os.DirEntry[str]]:
+    """Yield a ``DirEntry`` for every file below ``root``.
+
+    Entries keep the ``stat`` result once requested, so callers should use
+    ``entry.stat()`` and ``entry.path`` rather than re-deriving them.
+    """
+    if exclude and (root == exclude or exclude in root.parents):
+        return
+    # frozenset() hands back an existing frozenset without copying it.
+    protected = frozenset(protected_dir_names)
+    excluded = str(exclude) if exclude else None
+    stack = [str(root)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as iterator:
+                entries = list(iterator)
+        except OSError:
             continue
-        filtered_dirs = []
-        for dirname in dirnames:
-            if skip_hidden and dirname.startswith("."):
-                continue
-            if dirname in protected:
-                continue
-            filtered_dirs.append(dirname)
-        dirnames[:] = filtered_dirs
-        for name in filenames:
-            if skip_hidden and name.startswith("."):
+        if _SORT_BY_INODE:
+            # Files with neighbouring inodes tend to sit close together on disk,
+            # so visiting them in inode order cuts seeks on spinning disks.
+            entries.sort(key=os.DirEntry.inode)
+        subdirs = []
+        for entry in entries:
+            if skip_hidden and entry.name.startswith("."):
                 continue
-            yield current_dir / name
-
-
-def guess_category(path: Path, text_profile: Optional[Counter[str]]) -> Tuple[str, Optional[str]]:
-    ext = path.suffix.lower()
-    category = EXTENSION_MAP.get(ext)
-
-    if not category:
-        mime, _ = mimetypes.guess_type(str(path))
-        if mime:
-            if mime.startswith("image/"):
-                category = "Images"
-            elif mime.startswith("video/"):
-                category = "Videos"
-            elif mime.startswith("audio/"):
-                category = "Audio"
-            elif mime in {"application/zip", "application/x-tar"}:
-                category = "Archives"
-            elif mime.startswith("text/"):
-                category = "Documents"
-
-    if not category:
-        category = DEFAULT_CATEGORY
-
-    theme = None
-    if text_profile:
-        theme = select_theme(text_profile)
-        if theme:
-            category = f"Documents/{theme}"
-
-    if category == "Documents" and theme:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if not is_dir:
+                yield entry
+            elif entry.name not in protected and entry.path != excluded and not entry.is_symlink():
+                subdirs.append(entry.path)
+        # Reversed so directories are still visited in the order listed above.
+        stack.extend(reversed(subdirs))
+
+
+def guess_category(
+    ext: str,
+    mime: Optional[str],
+    text_profile: Optional[Counter[str]],
+) -> Tuple[str, Optional[str]]:
+    """Classify a file from its lowercase suffix (see :func:`file_suffix`) and MIME type."""
+    theme = select_theme(text_profile) if text_profile else None
+    return _categorize(ext, mime, theme)[0], theme
+
+
+def _categorize(ext: str, mime: Optional[str], theme: Optional[str]) -> Tuple[str, bool]:
+    """Return the category and whether it is sorted into YEAR/MONTH folders."""
+    category = SUFFIX_TO_CATEGORY.get(ext) or _category_for_mime(mime) or DEFAULT_CATEGORY
+    dated = category in _DATED_CATEGORIES
+
+    if theme:
         category = f"Documents/{theme}"
+        dated = False
 
-    return category, theme
+    return category, dated
 
 
 def select_theme(profile: Counter[str]) -> Optional[str]:
-    best_theme = None
-    best_score = 0
-    for theme, keywords in KEYWORD_THEMES.items():
-        score = sum(profile.get(keyword, 0) for keyword in keywords)
-        if score > best_score:
-            best_score = score
-            best_theme = theme
-    if best_score == 0:
+    scores: Counter[str] = Counter()
+    # Intersecting the key views walks whichever side is smaller.
+    for keyword in profile.keys() & _KEYWORD_TO_THEME.keys():
+        scores[_KEYWORD_TO_THEME[keyword]] += profile[keyword]
+    if not scores:
+        return None
+    # Ties go to the theme listed first in KEYWORD_THEMES.
+    best_theme = max(KEYWORD_THEMES, key=lambda theme: scores[theme])
+    if scores[best_theme] <= 0:
         return None
     return best_theme
 
 
-def text_profile(path: Path, mime: Optional[str]) -> Optional[Counter[str]]:
+def text_profile(
+    path: Union[str, Path],
+    mime: Optional[str],
+    size: Optional[int] = None,
+) -> Optional[Counter[str]]:
+    content = _text_sample(path, mime, size)
+    if content is None:
+        return None
+    return Counter(_TOKEN_RE.findall(content))
+
+
+def _text_sample(path: Union[str, Path], mime: Optional[str], size: Optional[int]) -> Optional[str]:
+    """Return the lowercased start of a text file, or ``None`` for non-text files."""
     if not mime:
         return None
-    if not any(mime.startswith(prefix.rstrip("/")) for prefix in TEXT_MIME_PREFIXES):
+    if not mime.startswith(_TEXT_PREFIXES):
         return None
+    if size == 0:
+        return None
+    # Keywords in the first page are representative enough for huge files.
+    limit = 4096 if size is not None and size > 1_000_000 else 20_000
     try:
-        with path.open("r", encoding="utf-8", errors="ignore") as handle:
-            content = handle.read(20_000)
-    except (OSError, UnicodeError):
+        with open(path, "rb") as handle:
+            return handle.read(limit).decode("utf-8", errors="ignore").lower()
+    except OSError:
         return None
-    tokens = [token.lower() for token in _tokenize(content)]
-    return Counter(tokens)
 
 
-def _tokenize(text: str) -> Iterable[str]:
-    current = []
-    for char in text:
-        if char.isalnum():
-            current.append(char)
-        else:
-            if current:
-                yield "".join(current)
-                current.clear()
-    if current:
-        yield "".join(current)
+def _tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text)
+
+
+def file_suffix(name: str) -> str:
+    """Return the lowercase suffix of a file name, following ``PurePath.suffix``."""
+    dot = name.rfind(".")
+    if 0 < dot < len(name) - 1:
+        return name[dot:].lower()
+    return ""
+
+
+def _mime_suffix(name: str) -> str:
+    """Return the part of ``name`` that ``mimetypes.guess_type`` looks at.
+
+    After a compression suffix such as ``.xz`` the suffix before it counts too,
+    so ``a.tar.xz`` gives ``.tar.xz``. Case is kept, as ``mimetypes`` expects.
+    """
+    dot = name.rfind(".")
+    if dot <= 0:
+        return ""
+    if name[dot:] in mimetypes.encodings_map:
+        previous = name.rfind(".", 0, dot)
+        if previous > 0:
+            return name[previous:]
+    return name[dot:]
+
+
+def _reads_content(ext: str) -> bool:
+    """Whether classifying a file with this suffix may look at its content."""
+    return ext not in EXTENSION_MAP or ext in _TEXT_EXTENSIONS
+
+
+def _analyze(item: Tuple[str, str, Optional[int]]) -> Tuple[str, Optional[str], bool]:
+    """Classify ``(path, suffix, size)`` into ``(category, theme, dated)``.
+
+    Top-level so it can run in a worker process.
+    """
+    path_str, ext, size = item
+    if not _reads_content(ext):
+        category, dated = _categorize(ext, None, None)
+        return category, None, dated
+    mime = _mime_for_suffix(_mime_suffix(os.path.basename(path_str)))
+    content = _text_sample(path_str, mime, size)
+    theme = select_theme(Counter(_TOKEN_RE.findall(content))) if content else None
+    category, dated = _categorize(ext, mime, theme)
+    return category, theme, dated
+
+
+def _analyze_all(
+    items: Sequence[Tuple[str, str, Optional[int]]],
+) -> List[Tuple[str, Optional[str], bool]]:
+    # Tokenizing is pure Python, so many text files are spread over processes
+    # rather than threads. Everything else is classified by suffix alone and
+    # stays in this process.
+    readers = [item for item in items if _reads_content(item[1])]
+    if len(readers) >= PROCESS_POOL_MIN_TEXT_FILES:
+        try:
+            with ProcessPoolExecutor() as executor:
+                analyzed = executor.map(_analyze, readers, chunksize=64)
+                return [next(analyzed) if _reads_content(item[1]) else _analyze(item) for item in items]
+        except (OSError, NotImplementedError, BrokenProcessPool):
+            pass
+    return [_analyze(item) for item in items]
 
 
 @dataclasses.dataclass
@@ -243,28 +411,180 @@ class PlanReport:
     files: List[FilePlan]
 
     def summary(self) -> Mapping[str, int]:
-        counts: MutableMapping[str, int] = defaultdict(int)
-        for plan in self.files:
-            counts[plan.category] += 1
-        return dict(sorted(counts.items(), key=lambda item: item[0]))
+        return dict(sorted(Counter(plan.category for plan in self.files).items()))
 
     def to_json(self) -> str:
         serializable = {
             "root": str(self.root),
-            "files": [
-                {
-                    "source": str(plan.source),
-                    "destination": str(plan.destination),
-                    "category": plan.category,
-                    "theme": plan.theme,
-                    "duplicate": plan.is_duplicate,
-                    "duplicate_of": str(plan.duplicate_of) if plan.duplicate_of else None,
-                }
-                for plan in self.files
-            ],
+            "files": [_plan_record(plan) for plan in self.files],
         }
         return json.dumps(serializable, indent=2)
 
+    def dump_json(self, fp: TextIO) -> None:
+        """Write the same document as :meth:`to_json`, one file record at a time."""
+        fp.write(f'{{"root": {json.dumps(str(self.root))}, "files": [')
+        separator = "\n  "
+        for plan in self.files:
+            fp.write(separator)
+            fp.write(json.dumps(_plan_record(plan)))
+            separator = ",\n  "
+        fp.write("\n]}\n")
+
+
+def _plan_record(plan: FilePlan) -> Dict[str, object]:
+    return {
+        "source": str(plan.source),
+        "destination": str(plan.destination),
+        "category": plan.category,
+        "theme": plan.theme,
+        "duplicate": plan.is_duplicate,
+        "duplicate_of": str(plan.duplicate_of) if plan.duplicate_of else None,
+    }
+
+
+class _DuplicateIndex:
+    """Find duplicates in stages: size, then a digest of both ends, then the full digest.
+
+    A stage only reads the files that still share a bucket after the previous
+    stage, so files with a unique size are never opened. Reads run on a thread
+    pool (hashing releases the GIL); buckets are resolved on the calling thread.
+    """
+
+    def __init__(self, crypto: bool, max_workers: Optional[int] = None) -> None:
+        self.crypto = crypto
+        # Twice the core count lets reads for one file overlap hashing of another.
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) * 2)
+
+    def resolve(self, entries: Sequence[Tuple[str, Optional[os.stat_result]]]) -> List[Optional[int]]:
+        """Map each ``(path, stat)`` to the index of an earlier identical file, if any.
+
+        Files without a stat result (for example when ``stat`` failed) are never matched.
+        """
+        originals: List[Optional[int]] = [None] * len(entries)
+        files: List[Tuple[str, int]] = []
+        by_size: Dict[int, List[int]] = defaultdict(list)
+        by_inode: Dict[Tuple[int, int], int] = {}
+        for index, (path, stats) in enumerate(entries):
+            files.append((path, stats.st_size if stats else -1))
+            if stats is None:
+                continue
+            # Hard links share an inode and therefore their content; no read needed.
+            # Some platforms report st_ino as 0 when it is unknown.
+            if stats.st_ino:
+                original = by_inode.setdefault((stats.st_dev, stats.st_ino), index)
+                if original != index:
+                    originals[index] = original
+                    continue
+            by_size[stats.st_size].append(index)
+        candidates = _shared_buckets(by_size.values())
+        if not candidates:
+            return originals
+
+        # Sample reads are short and latency bound; on large batches keep many
+        # of them in flight so the device queue stays full.
+        sample_workers = self.max_workers
+        if len(candidates) >= SAMPLE_READ_BATCH_MIN_FILES:
+            sample_workers = max(sample_workers, SAMPLE_READ_WORKERS)
+        with ThreadPoolExecutor(max_workers=sample_workers) as executor:
+            samples = executor.map(self._sample_digest, (files[index] for index in candidates))
+            by_sample: Dict[Tuple[int, bytes], List[int]] = defaultdict(list)
+            sample_of: Dict[int, bytes] = {}
+            for index, sample in zip(candidates, samples):
+                sample_of[index] = sample
+                by_sample[(files[index][1], sample)].append(index)
+        candidates = _shared_buckets(by_sample.values())
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            digests = executor.map(
+                lambda index: self._digest(files[index][0], files[index][1], sample_of[index]),
+                candidates,
+            )
+            digest_of = dict(zip(candidates, digests))
+
+        first_seen: Dict[Tuple[int, str], int] = {}
+        for index in sorted(digest_of):
+            key = (files[index][1], digest_of[index])
+            original = first_seen.setdefault(key, index)
+            if original != index and self._same_content(files[original][0], files[index][0]):
+                originals[index] = original
+        # A hard link may point at a file that turned out to be a copy itself.
+        # Originals always come first, so one forward pass collapses the chain.
+        for index, original in enumerate(originals):
+            if original is not None and originals[original] is not None:
+                originals[index] = originals[original]
+        return originals
+
+    def _digest(self, path: str, size: int, sample: bytes) -> str:
+        # The first and last SAMPLE_BYTES already cover small files completely.
+        if size <= 2 * SAMPLE_BYTES:
+            return sample.hex()
+        # Without crypto, equal hashes are confirmed with filecmp, which wants
+        # the pages still cached.
+        return Organizer._hash_file(path, crypto=self.crypto, drop_cache=self.crypto)
+
+    def _sample_digest(self, file: Tuple[str, int]) -> bytes:
+        """Digest the first and last ``SAMPLE_BYTES`` of a file."""
+        path, size = file
+        try:
+            with open(path, "rb") as handle:
+                sample = handle.read(SAMPLE_BYTES)
+                if size > SAMPLE_BYTES:
+                    handle.seek(max(SAMPLE_BYTES, size - SAMPLE_BYTES))
+                    sample += handle.read(SAMPLE_BYTES)
+        except OSError:
+            return f"error:{path}".encode()
+        if self.crypto or xxhash is None:
+            if blake3 is not None:
+                return blake3.blake3(sample).digest()
+            return hashlib.sha256(sample).digest()
+        return xxhash.xxh3_128_digest(sample)
+
+    def _same_content(self, original: str, candidate: str) -> bool:
+        # xxHash is not collision resistant, so confirm matches byte for byte.
+        if self.crypto:
+            return True
+        try:
+            return filecmp.cmp(original, candidate, shallow=False)
+        except OSError:
+            return False
+
+
+def _entry_stat(entry: os.DirEntry[str]) -> Optional[os.stat_result]:
+    # DirEntry caches the result, so callers may ask for it more than once.
+    try:
+        return entry.stat()
+    except OSError:
+        return None
+
+
+# UTC offsets and DST changes fall on quarter hours, so every timestamp in a
+# bucket maps to the same local year and month.
+_DATE_BUCKET_SECONDS = 15 * 60
+
+
+@functools.lru_cache(maxsize=4096)
+def _year_month(bucket: int) -> Tuple[str, str]:
+    return _format_year_month(datetime.fromtimestamp(bucket * _DATE_BUCKET_SECONDS))
+
+
+def _format_year_month(moment: datetime) -> Tuple[str, str]:
+    return f"{moment.year:04d}", f"{moment.month:02d}"
+
+
+def _fadvise(fd: int, advice_name: str) -> None:
+    # posix_fadvise is missing on macOS and Windows; the hint is best effort.
+    advice = getattr(os, advice_name, None)
+    if advice is None or not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, advice)
+    except OSError:
+        pass
+
+
+def _shared_buckets(buckets: Iterable[List[int]]) -> List[int]:
+    return sorted(index for bucket in buckets if len(bucket) > 1 for index in bucket)
+
 
 CRITICAL_TARGETS = {
     Path("/"),
@@ -277,6 +597,12 @@ CRITICAL_TARGETS = {
     Path("/etc"),
     Path("/var"),
 }
+_CRITICAL_PATHS = frozenset(str(path) for path in CRITICAL_TARGETS)
+# The filesystem root protects only itself; every other critical target also
+# protects everything below it.
+_CRITICAL_PREFIXES = tuple(
+    os.path.join(str(path), "") for path in CRITICAL_TARGETS if path != path.parent
+)
 
 
 class Organizer:
@@ -288,16 +614,22 @@ class Organizer:
         *,
         remove_duplicates: bool = False,
         root_name: str = DEFAULT_ROOT_NAME,
+        crypto_hash: bool = False,
+        detect_duplicates: bool = True,
     ) -> None:
         self.target = target.expanduser().resolve()
         self.apply_changes = apply_changes
         self.dry_run = dry_run
         self.remove_duplicates = remove_duplicates
+        self.crypto_hash = crypto_hash or xxhash is None
+        self.detect_duplicates = detect_duplicates
         self.organized_root = self.target / root_name
-        self._protected_dirs = set(PROTECTED_DIR_NAMES)
+        # Destinations are joined as strings; one Path is built per file.
+        self._organized_root_str = str(self.organized_root)
+        self._protected_dirs: AbstractSet[str] = PROTECTED_DIR_NAMES
         home = Path.home()
         if self.target == home:
-            self._protected_dirs.update({"Applications", "Library", ".ssh", ".config"})
+            self._protected_dirs = PROTECTED_DIR_NAMES | {"Applications", "Library", ".ssh", ".config"}
         self._skip_hidden = True
         self._duplicates_root = self.organized_root / "Duplicates"
 
@@ -318,90 +650,136 @@ class Organizer:
         return report
 
     def _build_plan(self) -> Iterator[FilePlan]:
-        hash_index: Dict[str, Path] = {}
+        entries = list(
+            walk_files(
+                self.target,
+                protected_dir_names=self._protected_dirs,
+                skip_hidden=self._skip_hidden,
+                exclude=self.organized_root,
+            )
+        )
+        plans: List[FilePlan] = []
+        items = []
+        for entry in entries:
+            ext = file_suffix(entry.name)
+            stats = _entry_stat(entry) if _reads_content(ext) else None
+            items.append((entry.path, ext, stats.st_size if stats else None))
+        classifications = _analyze_all(items)
+        scanned: List[Tuple[str, Optional[os.stat_result]]] = []
+        for entry, (category, theme, dated) in zip(entries, classifications):
+            plans.append(
+                FilePlan(
+                    source=Path(entry.path),
+                    destination=self._destination_for(entry, category, dated),
+                    category=category,
+                    theme=theme,
+                )
+            )
+            if self.detect_duplicates:
+                scanned.append((entry.path, _entry_stat(entry)))
+        # Hashing can take a while; keep only what it needs alive meanwhile.
+        del entries, items, classifications
+
+        if self.detect_duplicates:
+            originals = _DuplicateIndex(self.crypto_hash).resolve(scanned)
+        else:
+            originals = [None] * len(plans)
         name_counters: Dict[Path, int] = defaultdict(int)
-        for path in walk_files(
-            self.target,
-            protected_dir_names=self._protected_dirs,
-            skip_hidden=self._skip_hidden,
-            exclude=self.organized_root,
-        ):
-            if self.organized_root in path.parents:
-                continue
-            mime, _ = mimetypes.guess_type(str(path))
-            profile = text_profile(path, mime)
-            category, theme = guess_category(path, profile)
-            destination = self._destination_for(path, category)
-            file_hash = self._hash_file(path)
-            is_duplicate = False
-            duplicate_of = None
-            if file_hash in hash_index:
-                duplicate_of = hash_index[file_hash]
-                is_duplicate = True
+        for plan, original in zip(plans, originals):
+            if original is not None:
+                plan.is_duplicate = True
+                plan.duplicate_of = plans[original].destination
                 if self.remove_duplicates:
-                    destination = self._unique_duplicate_destination(path.name, name_counters)
-                    category = "Duplicates"
+                    plan.destination = self._unique_duplicate_destination(plan.source.name, name_counters)
+                    plan.category = "Duplicates"
                 else:
-                    destination = duplicate_of
-            else:
-                hash_index[file_hash] = destination
-            yield FilePlan(
-                source=path,
-                destination=destination,
-                category=category,
-                theme=theme,
-                is_duplicate=is_duplicate,
-                duplicate_of=duplicate_of,
-            )
+                    plan.destination = plan.duplicate_of
+            yield plan
 
     def _is_critical_target(self) -> bool:
-        return any(self.target == path or path in self.target.parents for path in CRITICAL_TARGETS)
-
-    def _destination_for(self, path: Path, category: str) -> Path:
-        if category.startswith("Images"):
-            return self._dated_destination(path, category)
-        if category.startswith("Videos"):
-            return self._dated_destination(path, category)
-        if category.startswith("Audio"):
-            return self._dated_destination(path, category)
-        return self.organized_root / category / path.name
-
-    def _dated_destination(self, path: Path, category: str) -> Path:
-        try:
-            stats = path.stat()
-            created = datetime.fromtimestamp(stats.st_mtime)
-        except OSError:
-            created = datetime.now()
-        year = created.strftime("%Y")
-        month = created.strftime("%m")
-        return self.organized_root / category / year / month / path.name
+        target = str(self.target)
+        return target in _CRITICAL_PATHS or target.startswith(_CRITICAL_PREFIXES)
+
+    def _destination_for(self, entry: os.DirEntry[str], category: str, dated: bool) -> Path:
+        if dated:
+            stats = _entry_stat(entry)
+            return self._dated_destination(entry.name, category, stats.st_mtime if stats else None)
+        return Path(os.path.join(self._organized_root_str, category, entry.name))
+
+    def _dated_destination(self, name: str, category: str, mtime: Optional[float]) -> Path:
+        year_month = None
+        if mtime is not None:
+            try:
+                year_month = _year_month(int(mtime // _DATE_BUCKET_SECONDS))
+            except (OSError, OverflowError, ValueError):
+                pass
+        year, month = year_month or _format_year_month(datetime.now())
+        return Path(os.path.join(self._organized_root_str, category, year, month, name))
 
     def _apply(self, plan: Iterable[FilePlan]) -> None:
         print("Applying plan ...")
+        created_dirs: Set[str] = set()
         for item in plan:
             if item.is_duplicate:
                 if self.remove_duplicates:
-                    destination_dir = item.destination.parent
-                    destination_dir.mkdir(parents=True, exist_ok=True)
                     print(f"Relocating duplicate to {item.destination}: {item.source}")
-                    shutil.move(str(item.source), str(item.destination))
+                    self._move(item, created_dirs)
                 else:
                     print(f"Skipping duplicate: {item.source} matches {item.duplicate_of}")
                 continue
-            destination_dir = item.destination.parent
-            destination_dir.mkdir(parents=True, exist_ok=True)
             print(f"Moving {item.source} -> {item.destination}")
-            shutil.move(str(item.source), str(item.destination))
+            self._move(item, created_dirs)
         print("Done.")
 
     @staticmethod
-    def _hash_file(path: Path) -> str:
-        digest = hashlib.sha256()
+    def _move(item: FilePlan, created_dirs: Set[str]) -> None:
+        source = str(item.source)
+        destination = str(item.destination)
+        destination_dir = os.path.dirname(destination)
+        if destination_dir not in created_dirs:
+            os.makedirs(destination_dir, exist_ok=True)
+            created_dirs.add(destination_dir)
+        # A rename is a single syscall; shutil.move is only needed across volumes.
         try:
-            with path.open("rb") as handle:
-                for chunk in iter(lambda: handle.read(1024 * 1024), b""):
-                    digest.update(chunk)
-        except OSError:
+            os.replace(source, destination)
+        except OSError as exc:
+            if exc.errno != errno.EXDEV:
+                raise
+            shutil.move(source, destination)
+
+    @staticmethod
+    def _hash_file(path: Union[str, Path], crypto: bool = False, drop_cache: bool = True) -> str:
+        if blake3 is not None and (crypto or xxhash is None):
+            # BLAKE3 is cryptographic but SIMD-accelerated and hashes large
+            # files on several threads, so it keeps up with fast disks.
+            try:
+                return blake3.blake3(max_threads=blake3.blake3.AUTO).update_mmap(path).hexdigest()
+            except OSError:
+                return f"error:{path}"
+        digest = hashlib.sha256() if crypto or xxhash is None else xxhash.xxh3_128()
+        try:
+            with open(path, "rb", buffering=0) as handle:
+                fd = handle.fileno()
+                _fadvise(fd, "POSIX_FADV_SEQUENTIAL")
+                _fadvise(fd, "POSIX_FADV_WILLNEED")
+                size = os.fstat(fd).st_size
+                if 0 < size <= MMAP_MAX_BYTES:
+                    with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mapped:
+                        digest.update(mapped)
+                else:
+                    # Unbuffered readinto a reused buffer: no per-chunk bytes
+                    # objects and no copy through a BufferedReader.
+                    buffer = bytearray(1024 * 1024)
+                    view = memoryview(buffer)
+                    while True:
+                        count = handle.readinto(buffer)
+                        if not count:
+                            break
+                        digest.update(view[:count])
+                if drop_cache:
+                    # The file is unlikely to be read again, so let the kernel drop it.
+                    _fadvise(fd, "POSIX_FADV_DONTNEED")
+        except (OSError, ValueError):
             return f"error:{path}"
         return digest.hexdigest()
 
@@ -456,6 +834,14 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
         action="store_true",
         help="Move duplicate files into an Organized/Duplicates folder instead of leaving them in place.",
     )
+    parser.add_argument(
+        "--crypto-hash",
+        action="store_true",
+        help=(
+            "Detect duplicates with a cryptographic hash (BLAKE3 if installed, otherwise SHA-256) "
+            "instead of xxHash3."
+        ),
+    )
     return parser.parse_args(argv)
 
 
@@ -467,6 +853,10 @@ def main(argv: Optional[List[str]] = None) -> int:
         dry_run=args.dry_run,
         remove_duplicates=args.remove_duplicates,
         root_name=args.root_name,
+        crypto_hash=args.crypto_hash,
+        # A dry run without --json only prints category counts, which duplicates
+        # affect only when they are relocated.
+        detect_duplicates=args.remove_duplicates or args.json or (args.apply and not args.dry_run),
     )
     try:
         report = organizer.run()
@@ -475,7 +865,7 @@ def main(argv: Optional[List[str]] = None) -> int:
         return 1
     if args.json:
         print("\nPlan (JSON):")
-        print(report.to_json())
+        report.dump_json(sys.stdout)
     return 0
 
 
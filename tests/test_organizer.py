@@ -1,5 +1,9 @@
+import hashlib
+import io
 import json
+import os
 import sys
+from datetime import datetime
 from pathlib import Path
 
 import pytest
@@ -9,6 +13,7 @@ if str(ROOT) not in sys.path:
     sys.path.append(str(ROOT))
 
 import organizer
+from mac_organizer import core
 
 
 def test_module_package_exposes_main():
@@ -28,15 +33,25 @@ def test_tokenize_basic():
     assert tokens == ["Hello", "World", "2024"]
 
 
+def test_non_ascii_letters_do_not_split_words():
+    text = "budgetänderung bankübersicht"
+    assert organizer._tokenize(text) == ["budgetänderung", "bankübersicht"]
+    assert organizer.select_theme(organizer.Counter(organizer._tokenize(text))) is None
+
+
 def test_select_theme_prefers_high_score():
     profile = organizer.Counter({"invoice": 2, "tax": 1, "travel": 3})
     assert organizer.select_theme(profile) == "Finance"
 
 
-def test_guess_category_uses_extension(tmp_path: Path):
-    file_path = tmp_path / "photo.JPG"
-    file_path.write_bytes(b"fake")
-    category, theme = organizer.guess_category(file_path, None)
+def test_select_theme_breaks_ties_by_theme_order():
+    profile = organizer.Counter({"meeting": 1, "tax": 1, "unrelated": 5})
+    assert organizer.select_theme(profile) == "Finance"
+    assert organizer.select_theme(organizer.Counter({"unrelated": 5})) is None
+
+
+def test_guess_category_uses_extension():
+    category, theme = organizer.guess_category(organizer.file_suffix("photo.JPG"), None, None)
     assert category == "Images"
     assert theme is None
 
@@ -45,7 +60,7 @@ def test_text_profile_and_theme(tmp_path: Path):
     file_path = tmp_path / "notes.txt"
     file_path.write_text("Project proposal meeting minutes", encoding="utf-8")
     profile = organizer.text_profile(file_path, "text/plain")
-    category, theme = organizer.guess_category(file_path, profile)
+    category, theme = organizer.guess_category(".txt", "text/plain", profile)
     assert category == "Documents/Work"
     assert theme == "Work"
 
@@ -95,6 +110,12 @@ def test_refuses_system_target(tmp_path: Path):
         org.run()
 
 
+def test_critical_target_covers_descendants_but_not_everything(tmp_path: Path):
+    assert organizer.Organizer(Path("/"), apply_changes=False, dry_run=True)._is_critical_target()
+    assert organizer.Organizer(Path("/usr/share"), apply_changes=False, dry_run=True)._is_critical_target()
+    assert not organizer.Organizer(tmp_path, apply_changes=False, dry_run=True)._is_critical_target()
+
+
 def test_duplicate_removal_moves_to_duplicates(tmp_path: Path):
     original = tmp_path / "report.pdf"
     duplicate = tmp_path / "copy.pdf"
@@ -122,3 +143,192 @@ def test_duplicate_removal_moves_to_duplicates(tmp_path: Path):
     assert moved[0].read_bytes() == b"sample"
     organized_docs = tmp_path / "Organized" / "Documents"
     assert list(organized_docs.glob("*.pdf")), "One copy should remain in Organized/Documents"
+
+
+@pytest.mark.parametrize(
+    ("flags", "hashes"),
+    [
+        ([], False),
+        (["--apply", "--dry-run"], False),
+        (["--json"], True),
+        (["--remove-duplicates"], True),
+        (["--apply"], True),
+    ],
+)
+def test_cli_detects_duplicates_only_when_the_run_needs_them(tmp_path: Path, monkeypatch, flags, hashes):
+    calls = []
+
+    def resolve(self, entries):
+        calls.append(entries)
+        return [None] * len(entries)
+
+    monkeypatch.setattr(core._DuplicateIndex, "resolve", resolve)
+    (tmp_path / "notes.txt").write_text("notes", encoding="utf-8")
+    assert organizer.main([str(tmp_path), *flags]) == 0
+    assert bool(calls) is hashes
+
+
+def test_crypto_hash_falls_back_to_sha256(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(core, "blake3", None)
+    file_path = tmp_path / "data.bin"
+    file_path.write_bytes(b"payload")
+    digest = organizer.Organizer._hash_file(file_path, crypto=True)
+    assert digest == hashlib.sha256(b"payload").hexdigest()
+
+
+def test_duplicates_require_matching_content_beyond_samples(tmp_path: Path):
+    edge = b"x" * organizer.SAMPLE_BYTES
+    (tmp_path / "a.bin").write_bytes(edge + b"middle-a" + edge)
+    (tmp_path / "b.bin").write_bytes(edge + b"middle-b" + edge)
+    (tmp_path / "c.bin").write_bytes(edge + b"middle-a" + edge)
+    (tmp_path / "d.bin").write_bytes(b"unique size")
+
+    org = organizer.Organizer(tmp_path, apply_changes=False, dry_run=True)
+    plan = {item.source.name: item for item in org._build_plan()}
+
+    assert [name for name, item in sorted(plan.items()) if item.is_duplicate] in (["c.bin"], ["a.bin"])
+    assert not plan["b.bin"].is_duplicate
+    assert not plan["d.bin"].is_duplicate
+
+
+def test_hashing_keeps_pages_cached_for_byte_comparison(tmp_path: Path, monkeypatch):
+    advice = []
+    monkeypatch.setattr(core, "_fadvise", lambda fd, name: advice.append(name))
+    file_path = tmp_path / "large.bin"
+    file_path.write_bytes(b"x" * (3 * core.SAMPLE_BYTES))
+    size = file_path.stat().st_size
+
+    core._DuplicateIndex(crypto=False)._digest(str(file_path), size, b"")
+    assert "POSIX_FADV_DONTNEED" not in advice
+
+    monkeypatch.setattr(core, "blake3", None)
+    core._DuplicateIndex(crypto=True)._digest(str(file_path), size, b"")
+    assert "POSIX_FADV_DONTNEED" in advice
+
+
+def test_process_pool_classification_matches_serial(tmp_path: Path, monkeypatch):
+    (tmp_path / "notes.txt").write_text("invoice tax receipt", encoding="utf-8")
+    (tmp_path / "song.mp3").write_bytes(b"id3")
+    items = sorted((str(path), path.suffix, None) for path in tmp_path.iterdir())
+
+    serial = core._analyze_all(items)
+    monkeypatch.setattr(core, "PROCESS_POOL_MIN_TEXT_FILES", 1)
+    assert core._analyze_all(items) == serial
+    assert ("Documents/Finance", "Finance", False) in serial
+
+
+def test_walk_files_skips_excluded_and_hidden(tmp_path: Path):
+    (tmp_path / "keep").mkdir()
+    (tmp_path / "keep" / "a.txt").write_text("a", encoding="utf-8")
+    (tmp_path / ".hidden").mkdir()
+    (tmp_path / ".hidden" / "b.txt").write_text("b", encoding="utf-8")
+    (tmp_path / "Organized" / "Documents").mkdir(parents=True)
+    (tmp_path / "Organized" / "Documents" / "c.txt").write_text("c", encoding="utf-8")
+
+    entries = list(
+        organizer.walk_files(tmp_path, skip_hidden=True, exclude=tmp_path / "Organized")
+    )
+    assert [entry.path for entry in entries] == [str(tmp_path / "keep" / "a.txt")]
+
+
+def test_media_files_are_sorted_by_year_and_month(tmp_path: Path):
+    photo = tmp_path / "photo.jpg"
+    photo.write_bytes(b"jpeg")
+    timestamp = datetime(2021, 3, 14, 12, 0).timestamp()
+    os.utime(photo, (timestamp, timestamp))
+
+    org = organizer.Organizer(tmp_path, apply_changes=False, dry_run=True)
+    (plan,) = list(org._build_plan())
+    assert plan.destination == tmp_path / "Organized" / "Images" / "2021" / "03" / "photo.jpg"
+
+
+def test_plan_report_dump_json_matches_to_json(tmp_path: Path):
+    plan = organizer.PlanReport(
+        root=tmp_path,
+        files=[
+            organizer.FilePlan(
+                source=tmp_path / "résumé.txt",
+                destination=tmp_path / "Organized/Documents/résumé.txt",
+                category="Documents",
+                theme=None,
+            ),
+            organizer.FilePlan(
+                source=tmp_path / "copy.txt",
+                destination=tmp_path / "Organized/Documents/résumé.txt",
+                category="Documents",
+                theme=None,
+                is_duplicate=True,
+                duplicate_of=tmp_path / "Organized/Documents/résumé.txt",
+            ),
+        ],
+    )
+    buffer = io.StringIO()
+    plan.dump_json(buffer)
+    assert json.loads(buffer.getvalue()) == json.loads(plan.to_json())
+
+
+def test_plan_report_dump_json_escapes_undecodable_names(tmp_path: Path):
+    # os.fsdecode() turns the invalid UTF-8 byte into a lone surrogate.
+    source = tmp_path / os.fsdecode(b"caf\xe9.txt")
+    plan = organizer.PlanReport(
+        root=tmp_path,
+        files=[organizer.FilePlan(source=source, destination=source, category="Documents", theme=None)],
+    )
+    buffer = io.BytesIO()
+    stream = io.TextIOWrapper(buffer, encoding="utf-8", errors="strict")
+    plan.dump_json(stream)
+    stream.flush()
+    assert json.loads(buffer.getvalue())["files"][0]["source"] == str(source)
+
+
+def test_hard_links_are_duplicates_without_reading(tmp_path: Path, monkeypatch):
+    original = tmp_path / "original.bin"
+    original.write_bytes(b"linked content")
+    os.link(original, tmp_path / "link.bin")
+
+    def fail(*args, **kwargs):
+        raise AssertionError("hard links should not be read")
+
+    monkeypatch.setattr(core._DuplicateIndex, "_sample_digest", fail)
+    org = organizer.Organizer(tmp_path, apply_changes=False, dry_run=True)
+    plan = list(org._build_plan())
+    assert [item.is_duplicate for item in plan].count(True) == 1
+
+
+def test_hard_link_to_a_copy_resolves_to_the_first_original(tmp_path: Path):
+    first = tmp_path / "a.pdf"
+    copy = tmp_path / "b.pdf"
+    first.write_bytes(b"same content")
+    copy.write_bytes(b"same content")
+    os.link(copy, tmp_path / "c.pdf")
+
+    entries = [(str(path), path.stat()) for path in (first, copy, tmp_path / "c.pdf")]
+    assert core._DuplicateIndex(crypto=False).resolve(entries) == [None, 0, 0]
+
+
+def test_compressed_suffixes_use_the_inner_type(tmp_path: Path):
+    assert core._analyze((str(tmp_path / "backup.tar.xz"), ".xz", None)) == ("Archives", None, False)
+    assert core._analyze((str(tmp_path / "backup.tar.Z"), ".z", None)) == ("Archives", None, False)
+
+
+def test_large_text_files_are_themed_from_their_first_page(tmp_path: Path):
+    notes = tmp_path / "notes.txt"
+    notes.write_text(" " * 4096 + "invoice tax receipt " * 60_000, encoding="utf-8")
+    size = notes.stat().st_size
+    assert size > 1_000_000
+    assert core._analyze((str(notes), ".txt", size)) == ("Documents", None, False)
+    assert core._analyze((str(notes), ".txt", 1_000_000))[1] == "Finance"
+
+
+def test_empty_text_files_are_not_opened(tmp_path: Path, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("empty files should not be opened")
+
+    monkeypatch.setattr(core, "open", fail, raising=False)
+    assert core._text_sample(tmp_path / "empty.txt", "text/plain", 0) is None
+
+
+def test_source_code_is_not_themed(tmp_path: Path):
+    script = tmp_path / "budget.py"
+    script.write_text("# invoice tax receipt budget\n", encoding="utf-8")
+    assert core._analyze((str(script), ".py", None)) == ("Code", None, False)